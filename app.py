@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import re
 import json
-import pyperclip
+import atexit
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 
 # Set up the app's title and layout with a collapsed sidebar
 st.set_page_config(
@@ -15,9 +21,73 @@ st.set_page_config(
 st.title("💡 Smart India Hackathon 2025 Problem Statements")
 
 # 1. Load your scraped data
-try:
-    df = pd.read_csv("sih_problem_statements_formatted.csv")
-    
+CSV_FILE = "sih_problem_statements_formatted.csv"
+DATA_FILE = "sih_problem_statements.feather"
+EDITS_FILE = "edits.jsonl"
+# The journal is moved here while it is being folded into the store
+COMPACTING_FILE = "edits.jsonl.compacting"
+JOURNAL_MAX_BYTES = 1024 * 1024
+NOTES_STATE_MAX = 64
+MIN_SEARCH_LENGTH = 2
+STATUS_OPTIONS = ["Not Reviewed", "Shortlisted", "Rejected", "See Later"]
+# Columns rebuilt on every load and never written to the store or exports
+DERIVED_COLUMNS = ['Description_Markdown']
+_HDR_PATS = [re.compile(p, re.IGNORECASE) for p in [r"(Problem Statement)", r"(Background)", r"(Expected Solution)"]]
+
+def format_description(descriptions):
+    """Turn raw Description text into Markdown with bold headers and bullet lists."""
+    text = descriptions.fillna("").astype(str)
+
+    # Add bold headers for common sections
+    for pat in _HDR_PATS:
+        text = text.str.replace(pat, r"**\1**", regex=True)
+
+    # Convert bullet points (•) into Markdown list dashes (-)
+    text = text.str.replace("•", "\n- ", regex=False)
+
+    # Ensure proper line breaks for readability
+    return text.str.replace(". ", ".\n", regex=False)
+
+@st.cache_resource
+def journal_lock():
+    """One lock per server process around journal appends, replays and compaction; sessions run on separate threads."""
+    return threading.RLock()
+
+def journal_paths():
+    """Journal files to replay, oldest first; a leftover compacting file comes from an interrupted compaction."""
+    return [p for p in (COMPACTING_FILE, EDITS_FILE) if os.path.exists(p)]
+
+def write_store(df, path=DATA_FILE):
+    """Write the frame to the Feather store without the derived columns."""
+    # Write to a temp file and swap it in so readers never see a half-written store
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        df.drop(columns=DERIVED_COLUMNS, errors='ignore').to_feather(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+@st.cache_data(show_spinner=False)
+def load_data(path):
+    """Read the Feather store once and keep the frame cached across reruns."""
+    if os.path.exists(path):
+        # Copy so the zero-copy Arrow buffers (e.g. category codes) are writable
+        df = pd.read_feather(path).copy()
+    else:
+        df = migrate_csv(path)
+
+    # Pre-render the Description once per load instead of on every rerun
+    df['Description_Markdown'] = format_description(df['Description'])
+    return df
+
+def migrate_csv(path):
+    """One-time migration: build the store from the scraped CSV."""
+    df = pd.read_csv(CSV_FILE)
+
     # Bug fix: Convert PS Number to string to enable search functionality
     df['PS Number'] = df['PS Number'].astype(str)
 
@@ -29,55 +99,247 @@ try:
         df['Status'] = "Not Reviewed"
     if 'Notes' not in df.columns:
         df['Notes'] = ""
+
+    # Low-cardinality columns as category so equality filters compare int codes
+    for col in ['Category', 'Organization', 'Theme', 'Department']:
+        df[col] = df[col].astype('category')
+    # Keep every selectable status as a category so edits never hit an unknown value
+    status_values = STATUS_OPTIONS + sorted(set(df['Status'].dropna()) - set(STATUS_OPTIONS))
+    df['Status'] = pd.Categorical(df['Status'], categories=status_values)
+    write_store(df, path)
+    return df
+
+def build_row_lookup(df):
+    """PS Number -> row position and editable column positions, for O(1) iat access."""
+    ps_to_idx = {ps: i for i, ps in enumerate(df['PS Number'])}
+    col_positions = {name: df.columns.get_loc(name) for name in ['Status', 'Notes']}
+    return ps_to_idx, col_positions
+
+def row_lookup(df):
+    """Session-cached build_row_lookup(); PS Numbers and column order never change."""
+    if 'row_lookup' not in st.session_state:
+        st.session_state['row_lookup'] = build_row_lookup(df)
+    return st.session_state['row_lookup']
+
+def replay_edits(df, path=EDITS_FILE, lookup=None):
+    """Apply journaled Status/Notes edits not yet flushed to the store; returns the number of unreadable lines skipped."""
+    if not os.path.exists(path):
+        return 0
+    ps_to_idx, col_positions = lookup or row_lookup(df)
+    skipped = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                edit = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn line from an interrupted append; keep replaying the rest
+                skipped += 1
+                continue
+            idx = ps_to_idx.get(edit['ps'])
+            if idx is not None:
+                df.iat[idx, col_positions[edit['field']]] = edit['value']
+    return skipped
+
+def store_mtime():
+    """Modification time of the Feather store, used to notice compactions by other sessions."""
+    return os.stat(DATA_FILE).st_mtime_ns if os.path.exists(DATA_FILE) else None
+
+def save_data(df):
+    """Merge the journal into the store on disk, updating this session's frame in place rather than reloading it."""
+    with journal_lock():
+        # Pick up edits other sessions journaled since this frame was loaded
+        for path in journal_paths():
+            replay_edits(df, path)
+        compact_journal()
+        load_data.clear()
+        st.session_state['store_mtime'] = store_mtime()
+    st.session_state['dirty'] = False
+    st.session_state['data_version'] = st.session_state.get('data_version', 0) + 1
+
+def record_edit(df, ps_number, field, value):
+    """Apply an edit in memory and append it to the journal instead of rewriting the store."""
+    ps_to_idx, col_positions = row_lookup(df)
+    df.iat[ps_to_idx[ps_number], col_positions[field]] = value
+    line = json.dumps({"ps": ps_number, "field": field, "value": value, "ts": time.time()}, ensure_ascii=False) + "\n"
+    with journal_lock(), open(EDITS_FILE, "a+b") as f:
+        # Start on a fresh line if an earlier append was torn mid-line, so this edit stays readable
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+        f.write(line.encode("utf-8"))
+        oversized = f.tell() > JOURNAL_MAX_BYTES
+    st.session_state['dirty'] = True
+    if field == 'Status':
+        st.session_state['data_version'] = st.session_state.get('data_version', 0) + 1
+    if oversized:
+        save_data(df)
+
+def ps_state(ps_number, current_notes):
+    """Per-PS notes/prompt bookkeeping, kept in one LRU dict instead of top-level session_state keys."""
+    states = st.session_state.setdefault('notes_state', OrderedDict())
+    if ps_number in states:
+        states.move_to_end(ps_number)
+    else:
+        states[ps_number] = {'last_saved': current_notes}
+        while len(states) > NOTES_STATE_MAX:
+            evicted, _ = states.popitem(last=False)
+            # Drop the evicted text area's widget state too; it is rebuilt from df on the next visit
+            if f"notes_{evicted}" in st.session_state:
+                del st.session_state[f"notes_{evicted}"]
+    return states[ps_number]
+
+def save_notes(df, ps_number, notes):
+    """Journal a PS's notes and mark them as the last saved value."""
+    record_edit(df, ps_number, 'Notes', notes)
+    states = st.session_state.get('notes_state', {})
+    if ps_number in states:
+        states[ps_number]['last_saved'] = notes
+
+def flush_edits(df):
+    """Write pending journaled edits to the store, if there are any."""
+    if st.session_state.get('dirty'):
+        save_data(df)
+
+def compact_journal(lock=None):
+    """Fold any journaled edits into the store on disk and remove the journal."""
+    with lock or journal_lock():
+        if not os.path.exists(DATA_FILE):
+            return
+        # Move the live journal aside first, unless an interrupted compaction left one to finish
+        if os.path.exists(EDITS_FILE) and not os.path.exists(COMPACTING_FILE):
+            os.replace(EDITS_FILE, COMPACTING_FILE)
+        paths = journal_paths()
+        if not paths:
+            return
+        df = pd.read_feather(DATA_FILE).copy()
+        lookup = build_row_lookup(df)
+        for path in paths:
+            replay_edits(df, path, lookup)
+        write_store(df)
+        for path in paths:
+            os.remove(path)
+
+@st.cache_resource
+def register_exit_flush():
+    """Register compact_journal() to run at server exit, once per process rather than once per rerun."""
+    atexit.register(compact_journal, journal_lock())
+
+def build_prompt_json(ps):
+    """Serialize the brainstorming prompt for a PS; only called when Copy Prompt is pressed."""
+    prompt = {
+        "Idea_Title": ps['Problem Statement Title'],
+        "PS_Number": ps['PS Number'],
+        "Organization": ps['Organization'],
+        "Theme": ps['Theme'],
+        "Challenge_Summary": ps['Description'],
+        "Brainstorm_Objective": "Generate innovative, practical, and high-impact features that will make this solution stand out among 500+ submissions in Smart India Hackathon.",
+        "Feature_Guidelines": [
+            "At least 3-5 UNIQUE features (technical or functional) that other teams are less likely to think of.",
+            "Features should balance innovation with feasibility (doable in SIH timeframe).",
+            "Emphasize use of cutting-edge tech (AI/ML, IoT, Blockchain, AR/VR, Cloud, Edge, etc.) relevant to the theme.",
+            "Include at least one feature focused on scalability, one on user experience, and one on measurable impact."
+        ],
+        "PPT_Must_Haves": [
+            "Problem Background (data/evidence of importance)",
+            "Proposed Solution (clear + innovative angle)",
+            "Unique Features (highlighted as differentiators)",
+            "Tech Stack (modern & feasible)",
+            "Implementation Roadmap (timeline for SIH)",
+            "Impact (social, economic, or national level)",
+            "Future Scope (scalability and sustainability)"
+        ],
+        "Output_Format": "Give a structured feature list + PPT outline tailored to this specific problem statement."
+    }
+    return json.dumps(prompt, ensure_ascii=False, indent=2)
+
+FILTER_COLUMNS = ['Category', 'Organization', 'Theme', 'Department', 'Status']
+
+def filter_options(df):
+    """Return the sidebar option lists, rebuilt only after the data is written back."""
+    version = st.session_state.get('data_version', 0)
+    cached = st.session_state.get('filter_opts')
+    if cached is None or cached[0] != version:
+        options = {col: ["All"] + sorted(df[col].dropna().unique().tolist()) for col in FILTER_COLUMNS}
+        cached = (version, options)
+        st.session_state['filter_opts'] = cached
+    return cached[1]
+
+def search_index(df):
+    """Lower-cased PS Number/Title arrays for substring search; these columns are never edited."""
+    if 'search_index' not in st.session_state:
+        st.session_state['search_index'] = (
+            df['PS Number'].str.lower().to_numpy(dtype=str),
+            df['Problem Statement Title'].fillna("").str.lower().to_numpy(dtype=str),
+        )
+    return st.session_state['search_index']
+
+try:
+    # Keep the working frame in session_state so reruns reuse it instead of a fresh cache copy;
+    # reload only when another session has compacted its edits into the store since
+    if 'df' not in st.session_state or st.session_state.get('store_mtime') != store_mtime():
+        with journal_lock():
+            df = load_data(DATA_FILE)
+            skipped = sum(replay_edits(df, path) for path in journal_paths())
+            st.session_state['store_mtime'] = store_mtime()
+        st.session_state['data_version'] = st.session_state.get('data_version', 0) + 1
+        if skipped:
+            st.warning(f"Skipped {skipped} unreadable line(s) in '{EDITS_FILE}'; those edits could not be restored.")
+        st.session_state['df'] = df
+    df = st.session_state['df']
+    register_exit_flush()
 except FileNotFoundError:
-    st.error("Error: The 'sih_problem_statements_formatted.csv' file was not found.")
+    st.error(f"Error: The '{CSV_FILE}' file was not found.")
     st.stop()
 
 # 2. Create the filter sidebar with search bar at the top
 st.sidebar.header("🔍 Filter & Search")
-search_query = st.sidebar.text_input("Search by PS Number or Title", "").strip()
-st.sidebar.markdown("---")
+options = filter_options(df)
+
+# Group the filters in a form so they trigger a single rerun on "Apply"
+with st.sidebar.form("filters"):
+    search_query = st.text_input("Search by PS Number or Title", "").strip()
+    st.markdown("---")
 
-categories = ["All"] + sorted(df['Category'].unique().tolist())
-organizations = ["All"] + sorted(df['Organization'].unique().tolist())
-themes = ["All"] + sorted(df['Theme'].unique().tolist())
-departments = ["All"] + sorted(df['Department'].unique().tolist())
-statuses = ["All"] + sorted(df['Status'].unique().tolist())
+    selected_category = st.selectbox("Category", options['Category'])
+    selected_org = st.selectbox("Organization", options['Organization'])
+    selected_theme = st.selectbox("Theme", options['Theme'])
+    selected_dept = st.selectbox("Department", options['Department'])
+    selected_status = st.selectbox("Status", options['Status'])
 
-selected_category = st.sidebar.selectbox("Category", categories)
-selected_org = st.sidebar.selectbox("Organization", organizations)
-selected_theme = st.sidebar.selectbox("Theme", themes)
-selected_dept = st.sidebar.selectbox("Department", departments)
-selected_status = st.sidebar.selectbox("Status", statuses)
+    st.form_submit_button("Apply")
 
 # 3. Filter the DataFrame based on user selections and search query
-filtered_df = df.copy()
-
-if selected_category != "All":
-    filtered_df = filtered_df[filtered_df['Category'] == selected_category]
-if selected_org != "All":
-    filtered_df = filtered_df[filtered_df['Organization'] == selected_org]
-if selected_theme != "All":
-    filtered_df = filtered_df[filtered_df['Theme'] == selected_theme]
-if selected_dept != "All":
-    filtered_df = filtered_df[filtered_df['Department'] == selected_dept]
-if selected_status != "All":
-    filtered_df = filtered_df[filtered_df['Status'] == selected_status]
-
-if search_query:
-    filtered_df = filtered_df[
-        filtered_df['PS Number'].str.contains(search_query, case=False, na=False) |
-        filtered_df['Problem Statement Title'].str.contains(search_query, case=False, na=False)
-    ]
+# Build a single boolean mask and index once instead of slicing per filter
+selections = {
+    'Category': selected_category,
+    'Organization': selected_org,
+    'Theme': selected_theme,
+    'Department': selected_dept,
+    'Status': selected_status,
+}
+mask = np.ones(len(df), dtype=bool)
+for col, selected in selections.items():
+    if selected != "All":
+        mask &= (df[col].values == selected)
+
+# Single-character queries match nearly everything, so skip the scan until the query is meaningful
+if len(search_query) >= MIN_SEARCH_LENGTH:
+    # Plain substring match on pre-lowered arrays, no regex engine per keystroke
+    ps_lower, title_lower = search_index(df)
+    query = search_query.lower()
+    mask &= (np.char.find(ps_lower, query) >= 0) | (np.char.find(title_lower, query) >= 0)
+
+# Read-only view for navigation; positional iloc access means no copy or index reset is needed
+filtered_df = df.iloc[np.flatnonzero(mask)]
 
 # Check if any problems are found after filtering
 if filtered_df.empty:
     st.warning("No problem statements match the selected filters or search query. Please adjust your search.")
     st.stop()
 
-# Reset index to allow for navigation
-filtered_df = filtered_df.reset_index(drop=True)
-
 # 4. Implement a "single page" view with navigation
 if 'current_ps_index' not in st.session_state:
     st.session_state.current_ps_index = 0
@@ -91,10 +353,12 @@ current_index = st.session_state.current_ps_index
 current_ps = filtered_df.iloc[current_index]
 
 # --- Progress Tracker (Sidebar) ---
-reviewed_count = (df['Status'] != "Not Reviewed").sum()
-shortlisted_count = (df['Status'] == "Shortlisted").sum()
-rejected_count = (df['Status'] == "Rejected").sum()
-see_later_count = (df['Status'] == "See Later").sum()
+# One counting pass over the Status codes instead of a scan per metric
+status_counts = df['Status'].value_counts()
+reviewed_count = len(df) - status_counts.get("Not Reviewed", 0)
+shortlisted_count = status_counts.get("Shortlisted", 0)
+rejected_count = status_counts.get("Rejected", 0)
+see_later_count = status_counts.get("See Later", 0)
 
 st.sidebar.markdown("### 📊 Progress Tracker")
 st.sidebar.markdown(f"- Reviewed: **{reviewed_count}/{len(df)}**")
@@ -108,12 +372,14 @@ st.markdown("---")
 col1, col2, col3 = st.columns([1, 6, 1])
 with col1:
     if st.button("⬅️ Previous"):
+        flush_edits(df)
         if st.session_state.current_ps_index > 0:
             st.session_state.current_ps_index -= 1
             st.rerun()
 
 with col3:
     if st.button("➡️ Next"):
+        flush_edits(df)
         if st.session_state.current_ps_index < total_problems - 1:
             st.session_state.current_ps_index += 1
             st.rerun()
@@ -133,94 +399,54 @@ st.markdown(f"**Category:** {current_ps['Category']}")
 st.markdown(f"**Theme:** {current_ps['Theme']}")
 
 # Editable status selector
-current_status = df.loc[df['PS Number'] == current_ps['PS Number'], 'Status'].values[0]
-new_status = st.selectbox("Update Status", ["Not Reviewed", "Shortlisted", "Rejected", "See Later"], index=["Not Reviewed", "Shortlisted", "Rejected", "See Later"].index(current_status))
+ps_to_idx, col_positions = row_lookup(df)
+current_row = ps_to_idx[current_ps['PS Number']]
+current_status = df.iat[current_row, col_positions['Status']]
+new_status = st.selectbox("Update Status", STATUS_OPTIONS, index=STATUS_OPTIONS.index(current_status))
 if new_status != current_status:
-    df.loc[df['PS Number'] == current_ps['PS Number'], 'Status'] = new_status
-    df.to_csv("sih_problem_statements_formatted.csv", index=False)
+    record_edit(df, current_ps['PS Number'], 'Status', new_status)
     st.success(f"Status updated to {new_status}")
 
 st.markdown("---")
 
-# Format Description properly with bold headers and bullet points
+# Description is formatted into Markdown once at load time; st.markdown only ships
+# the string, the Markdown-to-HTML rendering happens in the browser
 st.subheader("Description")
-description_text = current_ps['Description']
-
-# Add bold headers for common sections
-description_text = re.sub(r"(?i)(Problem Statement)", r"**\1**", description_text)
-description_text = re.sub(r"(?i)(Background)", r"**\1**", description_text)
-description_text = re.sub(r"(?i)(Expected Solution)", r"**\1**", description_text)
-
-# Convert bullet points (•) into Markdown list dashes (-)
-description_text = description_text.replace("•", "\n- ")
-
-# Ensure proper line breaks for readability
-description_text = description_text.replace(". ", ".\n")
-
-st.markdown(description_text)
+st.markdown(current_ps['Description_Markdown'])
 
 # --- 6. Notes Section (Auto-save + Save Button + Copy Prompt) ---
 st.subheader("📝 Your Notes")
-current_notes = df.loc[df['PS Number'] == current_ps['PS Number'], 'Notes'].values[0]
+current_notes = df.iat[current_row, col_positions['Notes']]
 current_notes = current_notes if pd.notna(current_notes) else ""
 
 # use a persistent key per PS so state is preserved while navigating
 notes_key = f"notes_{current_ps['PS Number']}"
-last_saved_key = f"last_saved_{current_ps['PS Number']}"
-
-if last_saved_key not in st.session_state:
-    st.session_state[last_saved_key] = current_notes
+current_state = ps_state(current_ps['PS Number'], current_notes)
 
 # Text area with session state key only
 new_notes = st.text_area("Write your notes here:", value=current_notes, height=120, key=notes_key)
 
-# Auto-save when content changes from last saved value
-if new_notes != st.session_state[last_saved_key]:
-    df.loc[df['PS Number'] == current_ps['PS Number'], 'Notes'] = new_notes
-    df.to_csv("sih_problem_statements_formatted.csv", index=False)
-    st.session_state[last_saved_key] = new_notes
+# Auto-save to the journal as soon as the text changes; the full store write waits for Previous/Next/Save
+if new_notes != current_state['last_saved']:
+    save_notes(df, current_ps['PS Number'], new_notes)
     st.success("Notes auto-saved! 📝")
 
 # Save button and copy prompt button on the same line
 col_a, col_b = st.columns([4,0.5])
 with col_a:
     if st.button("💾 Save Notes", key=f"save_{current_ps['PS Number']}"):
-        df.loc[df['PS Number'] == current_ps['PS Number'], 'Notes'] = new_notes
-        df.to_csv("sih_problem_statements_formatted.csv", index=False)
-        st.session_state[last_saved_key] = new_notes
+        # Auto-save above already journaled the text; write it through to the store
+        flush_edits(df)
         st.success("Notes saved successfully!")
 
-# Prepare improved prompt JSON to be copied
-prompt = {
-    "Idea_Title": current_ps['Problem Statement Title'],
-    "PS_Number": current_ps['PS Number'],
-    "Organization": current_ps['Organization'],
-    "Theme": current_ps['Theme'],
-    "Challenge_Summary": current_ps['Description'],
-    "Brainstorm_Objective": "Generate innovative, practical, and high-impact features that will make this solution stand out among 500+ submissions in Smart India Hackathon.",
-    "Feature_Guidelines": [
-        "At least 3-5 UNIQUE features (technical or functional) that other teams are less likely to think of.",
-        "Features should balance innovation with feasibility (doable in SIH timeframe).",
-        "Emphasize use of cutting-edge tech (AI/ML, IoT, Blockchain, AR/VR, Cloud, Edge, etc.) relevant to the theme.",
-        "Include at least one feature focused on scalability, one on user experience, and one on measurable impact."
-    ],
-    "PPT_Must_Haves": [
-        "Problem Background (data/evidence of importance)",
-        "Proposed Solution (clear + innovative angle)",
-        "Unique Features (highlighted as differentiators)",
-        "Tech Stack (modern & feasible)",
-        "Implementation Roadmap (timeline for SIH)",
-        "Impact (social, economic, or national level)",
-        "Future Scope (scalability and sustainability)"
-    ],
-    "Output_Format": "Give a structured feature list + PPT outline tailored to this specific problem statement."
-}
-prompt_json = json.dumps(prompt, ensure_ascii=False, indent=2)
-
-# Copy button with pyperclip (reliable)
+# Copy button with pyperclip, imported lazily since it can fail on headless servers
 with col_b:
     if st.button("📋 Copy Prompt", key=f"copy_{current_ps['PS Number']}"):
+        if 'prompt_json' not in current_state:
+            current_state['prompt_json'] = build_prompt_json(current_ps)
+        prompt_json = current_state['prompt_json']
         try:
+            import pyperclip
             pyperclip.copy(prompt_json)
             st.toast("Prompt copied to clipboard!")
         except Exception as e:
@@ -232,7 +458,7 @@ if st.sidebar.button("⬇️ Export Shortlisted"):
     if not shortlisted_df.empty:
         st.sidebar.download_button(
             label="Download Shortlisted CSV",
-            data=shortlisted_df.to_csv(index=False),
+            data=shortlisted_df.drop(columns=DERIVED_COLUMNS).to_csv(index=False),
             file_name="shortlisted_ideas.csv",
             mime="text/csv"
         )